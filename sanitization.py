@@ -1,10 +1,40 @@
-from presidio_analyzer import AnalyzerEngine
-from typing import Dict
-from presidio_anonymizer import AnonymizerEngine, DeanonymizeEngine, OperatorConfig
+from presidio_analyzer import AnalyzerEngine, BatchAnalyzerEngine, RecognizerRegistry
+from typing import Dict, List
+from presidio_anonymizer import AnonymizerEngine, OperatorConfig
 from presidio_anonymizer.operators import Operator, OperatorType
-from presidio_analyzer import PatternRecognizer, Pattern
+from presidio_analyzer import AnalysisExplanation, EntityRecognizer, Pattern, RecognizerResult
 import json
 import os
+import re
+import threading
+
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Key under which the placeholder -> original reverse index is kept in the entity mapping
+REVERSE_MAPPING_KEY = "__reverse__"
+# Key under which the next placeholder index per entity type is kept in the entity mapping
+COUNTER_KEY = "__counters__"
+# Bookkeeping keys which are not entity types
+INTERNAL_KEYS = (REVERSE_MAPPING_KEY, COUNTER_KEY)
+
+def _get_reverse_mapping(entity_mapping: Dict, entity_type: str) -> Dict:
+    """Get the placeholder -> original index for an entity type, building it if missing."""
+
+    reverse_mapping = entity_mapping.setdefault(REVERSE_MAPPING_KEY, {})
+    if entity_type not in reverse_mapping:
+        # Mappings loaded from disk carry no reverse index, so derive it once
+        reverse_mapping[entity_type] = {
+            val: key for key, val in entity_mapping.get(entity_type, {}).items()
+        }
+    return reverse_mapping[entity_type]
 
 class InstanceCounterAnonymizer(Operator):
     """
@@ -22,39 +52,33 @@ class InstanceCounterAnonymizer(Operator):
         # entity_mapping is a dict of dicts containing mappings per entity type
         entity_mapping: Dict[Dict:str] = params["entity_mapping"]
 
-        entity_mapping_for_type = entity_mapping.get(entity_type)
-        if not entity_mapping_for_type:
-            # Initialize the dictionary for this entity type
-            entity_mapping[entity_type] = {}
+        # Initialize the dictionary for this entity type if needed
+        entity_mapping_for_type = entity_mapping.setdefault(entity_type, {})
+        new_text = entity_mapping_for_type.get(text)
+        if new_text is None:
             new_text = self.REPLACING_FORMAT.format(
-                entity_type=entity_type, index=0
-            )
-            # Add the first entity to the mapping
-            entity_mapping[entity_type][text] = new_text
-        else:
-            if text in entity_mapping_for_type:
-                return entity_mapping_for_type[text]
-
-            previous_index = self._get_last_index(entity_mapping_for_type)
-            new_text = self.REPLACING_FORMAT.format(
-                entity_type=entity_type, index=previous_index + 1
+                entity_type=entity_type, index=self._next_index(entity_mapping, entity_type)
             )
             # Add the new entity to the mapping
-            entity_mapping[entity_type][text] = new_text
+            entity_mapping_for_type[text] = new_text
+            _get_reverse_mapping(entity_mapping, entity_type)[new_text] = text
 
         return new_text
 
     @staticmethod
-    def _get_last_index(entity_mapping_for_type: Dict) -> int:
-        """Get the last index for a given entity type."""
-
-        def get_index(value: str) -> int:
-            return int(value.split("_")[-1][:-1])
-
-        indices = [get_index(v) for v in entity_mapping_for_type.values()]
-        if not indices:
-            return -1  # Return -1 if there are no indices yet, so the next index will be 0
-        return max(indices)
+    def _next_index(entity_mapping: Dict, entity_type: str) -> int:
+        """Reserve the next index for a given entity type."""
+
+        counters = entity_mapping.setdefault(COUNTER_KEY, {})
+        index = counters.get(entity_type)
+        if index is None:
+            # Mappings loaded from disk carry no counter, so resume after the highest index
+            index = max(
+                (int(v[v.rindex("_") + 1:-1]) for v in entity_mapping[entity_type].values()),
+                default=-1,
+            ) + 1
+        counters[entity_type] = index + 1
+        return index
 
     def validate(self, params: Dict = None) -> None:
         """Validate operator parameters."""
@@ -86,18 +110,13 @@ class InstanceCounterDeanonymizer(Operator):
 
         if entity_type not in entity_mapping:
             raise ValueError(f"Entity type {entity_type} not found in entity mapping!")
-        if text not in entity_mapping[entity_type].values():
+
+        reverse_mapping_for_type = _get_reverse_mapping(entity_mapping, entity_type)
+        if text not in reverse_mapping_for_type:
             raise ValueError(f"Text {text} not found in entity mapping for entity type {entity_type}!")
 
-        return self._find_key_by_value(entity_mapping[entity_type], text)
+        return reverse_mapping_for_type[text]
 
-    @staticmethod
-    def _find_key_by_value(entity_mapping, value):
-        for key, val in entity_mapping.items():
-            if val == value:
-                return key
-        return None
-    
     def validate(self, params: Dict = None) -> None:
         """Validate operator parameters."""
 
@@ -112,7 +131,148 @@ class InstanceCounterDeanonymizer(Operator):
     def operator_type(self) -> OperatorType:
         return OperatorType.Deanonymize
 
-def save_entity_mapping(mapping, analyzed_entities=None, filename="entity_mapping.json", original_text=None, min_score_threshold=0.6):
+class CustomPatternRecognizer(EntityRecognizer):
+    """
+    Recognizer which detects all patterns of one custom entity
+    in a single scan of the text.
+
+    The patterns are compiled into one `re` alternation. It finds the same
+    matches as scanning each pattern separately, except where two patterns
+    match overlapping text: then the pattern listed first wins. Patterns which
+    cannot be combined (inline global flags, numbered backreferences) are
+    scanned one by one, as PatternRecognizer does.
+
+    When the `hyperscan` package is installed, the patterns are also compiled
+    into a Hyperscan prefilter, which skips the `re` scan on texts where none
+    of them can match. Matches always come from `re`, so the detected spans
+    are the same with or without Hyperscan.
+    """
+
+    # Same flags PatternRecognizer applies to its regexes
+    REGEX_FLAGS = re.DOTALL | re.MULTILINE | re.IGNORECASE
+    # Numbered backreferences, which point at the wrong group once patterns are combined
+    NUMBERED_BACKREFERENCE = re.compile(r"(?<!\\)(?:\\\\)*\\[1-9]")
+
+    def __init__(self, supported_entity: str, patterns: List[Pattern], context: List[str] = None):
+        """
+        Args:
+            supported_entity: The entity detected by the patterns
+            patterns: List of patterns detecting the entity
+            context: Context words supporting the entity
+        """
+        self.patterns = patterns
+        self._prefilter = None
+        self._regex = None
+        self._regexes = None
+        super().__init__(
+            supported_entities=[supported_entity],
+            name="CustomPatternRecognizer",
+            context=context,
+        )
+
+    def load(self) -> None:
+        """Compile the patterns into a single matcher."""
+
+        if hyperscan is not None:
+            self._prefilter = self._compile_prefilter()
+
+        if not any(self.NUMBERED_BACKREFERENCE.search(pattern.regex) for pattern in self.patterns):
+            try:
+                self._regex = re.compile(
+                    "|".join(
+                        f"(?P<p{index}>{pattern.regex})"
+                        for index, pattern in enumerate(self.patterns)
+                    ),
+                    self.REGEX_FLAGS,
+                )
+                return
+            except re.error:
+                # e.g. inline global flags, which are only allowed at the start of the whole regex
+                pass
+
+        # Scan the patterns which cannot be combined one by one, as PatternRecognizer does
+        self._regexes = [re.compile(pattern.regex, self.REGEX_FLAGS) for pattern in self.patterns]
+
+    def _compile_prefilter(self):
+        """Compile the patterns into a Hyperscan database telling whether any of them may match.
+
+        Prefilter mode may report false positives but never misses a match,
+        and approximates constructs Hyperscan does not support.
+        """
+        flags = (
+            hyperscan.HS_FLAG_CASELESS
+            | hyperscan.HS_FLAG_DOTALL
+            | hyperscan.HS_FLAG_MULTILINE
+            | hyperscan.HS_FLAG_SINGLEMATCH
+            | hyperscan.HS_FLAG_PREFILTER
+            | hyperscan.HS_FLAG_UTF8
+            | hyperscan.HS_FLAG_UCP
+        )
+        try:
+            database = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+            database.compile(
+                expressions=[pattern.regex.encode("utf-8") for pattern in self.patterns],
+                ids=list(range(len(self.patterns))),
+                elements=len(self.patterns),
+                flags=[flags] * len(self.patterns),
+            )
+            return database
+        except Exception as e:
+            print(f"Error compiling Hyperscan prefilter for {self.supported_entities[0]}, scanning with re only: {e}")
+            return None
+
+    def _may_match(self, text: str) -> bool:
+        """Tell whether any pattern may match the text."""
+
+        if self._prefilter is None:
+            return True
+        matched = []
+        self._prefilter.scan(
+            text.encode("utf-8"),
+            match_event_handler=lambda index, start, end, flags, context: matched.append(index),
+        )
+        return bool(matched)
+
+    def analyze(self, text: str, entities: List[str], nlp_artifacts=None) -> List[RecognizerResult]:
+        """Analyze the text for all patterns at once."""
+
+        if not self.patterns or not self._may_match(text):
+            return []
+        if self._regex is not None:
+            matches = [
+                (int(match.lastgroup[1:]), match.start(), match.end())
+                for match in self._regex.finditer(text)
+            ]
+        else:
+            matches = [
+                (index, match.start(), match.end())
+                for index, regex in enumerate(self._regexes)
+                for match in regex.finditer(text)
+            ]
+
+        results = []
+        for index, start, end in matches:
+            if start == end:
+                continue
+            pattern = self.patterns[index]
+            explanation = AnalysisExplanation(
+                recognizer=self.name,
+                original_score=pattern.score,
+                pattern_name=pattern.name,
+                pattern=pattern.regex,
+            )
+            results.append(
+                RecognizerResult(
+                    entity_type=self.supported_entities[0],
+                    start=start,
+                    end=end,
+                    score=pattern.score,
+                    analysis_explanation=explanation,
+                )
+            )
+        return results
+
+def save_entity_mapping(mapping, analyzed_entities=None, filename="entity_mapping.json", original_text=None, min_score_threshold=0.6, entity_texts=None):
     """Save the entity mapping and analyzed entities to a JSON file.
     
     Args:
@@ -121,11 +281,16 @@ def save_entity_mapping(mapping, analyzed_entities=None, filename="entity_mappin
         filename: Path to the output JSON file
         original_text: The original text used for extracting entity values
         min_score_threshold: Minimum confidence score threshold for entities (default: 0.6)
+        entity_texts: Entity values aligned with analyzed_entities, used instead of original_text
     """
     try:
-        # Convert the nested dict to a serializable format
+        # Convert the nested dict to a serializable format, leaving out the bookkeeping keys
         output_data = {
-            "mappings": {},
+            "mappings": {
+                entity_type: entities
+                for entity_type, entities in mapping.items()
+                if entity_type not in INTERNAL_KEYS
+            },
             "analyzed_entities": [],
             "metadata": {
                 "min_score_threshold": min_score_threshold,
@@ -134,34 +299,31 @@ def save_entity_mapping(mapping, analyzed_entities=None, filename="entity_mappin
             }
         }
         
-        # Process mappings
-        for entity_type, entities in mapping.items():
-            output_data["mappings"][entity_type] = {}
-            for original, anonymized in entities.items():
-                output_data["mappings"][entity_type][original] = anonymized
-        
         # Process analyzed entities if provided
-        if analyzed_entities and original_text:
-            # Count entities above threshold
-            entities_above_threshold = 0
-            
-            for entity in analyzed_entities:
-                entity_text = original_text[entity.start:entity.end]
-                
-                # Only include entities with score >= threshold in the JSON
-                if entity.score >= min_score_threshold:
-                    entities_above_threshold += 1
-                    output_data["analyzed_entities"].append({
-                        "entity_type": entity.entity_type,
-                        "entity_text": entity_text,
-                        "score": entity.score
-                    })
+        if analyzed_entities and (original_text or entity_texts):
+            # Only include entities with score >= threshold in the JSON
+            if entity_texts is None:
+                entity_texts = (original_text[entity.start:entity.end] for entity in analyzed_entities)
+            output_data["analyzed_entities"] = [
+                {
+                    "entity_type": entity.entity_type,
+                    "entity_text": entity_text,
+                    "score": entity.score
+                }
+                for entity, entity_text in zip(analyzed_entities, entity_texts)
+                if entity.score >= min_score_threshold
+            ]
             
             # Update metadata
-            output_data["metadata"]["entities_above_threshold"] = entities_above_threshold
+            output_data["metadata"]["entities_above_threshold"] = len(output_data["analyzed_entities"])
         
-        with open(filename, 'w') as f:
-            json.dump(output_data, f, indent=2)
+        if orjson is not None:
+            with open(filename, 'wb') as f:
+                f.write(orjson.dumps(output_data, option=orjson.OPT_INDENT_2))
+        else:
+            # Write raw UTF-8 like orjson, so the file is the same either way
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(output_data, f, indent=2, ensure_ascii=False)
         print(f"Entity data saved to {filename}")
         print(f"Included {output_data['metadata']['entities_above_threshold']} entities with score >= {min_score_threshold}")
         return True
@@ -181,7 +343,11 @@ def load_custom_entities(filename="custom_entities.json"):
         return []
 
 def create_custom_recognizers(entities):
-    """Create Presidio recognizers from custom entity definitions."""
+    """Create Presidio recognizers from custom entity definitions.
+    
+    The patterns of each entity are combined into a single CustomPatternRecognizer,
+    so the text is scanned once per entity instead of once per pattern.
+    """
     recognizers = []
     for entity in entities:
         try:
@@ -197,7 +363,7 @@ def create_custom_recognizers(entities):
                 )
             
             # Create the recognizer
-            recognizer = PatternRecognizer(
+            recognizer = CustomPatternRecognizer(
                 supported_entity=entity["entity_name"],
                 patterns=patterns,
                 context=entity.get("context", [])
@@ -209,50 +375,139 @@ def create_custom_recognizers(entities):
     
     return recognizers
 
-def anonymize_ticket(ticket_text, min_score_threshold=0.6):
-    """
-    Anonymize ticket text by replacing PII entities with unique identifiers.
+# Custom recognizers per custom entities file, keyed by path: ((mtime, size), recognizers)
+_RECOGNIZER_CACHE = {}
+_RECOGNIZER_LOCK = threading.Lock()
+
+def _get_recognizers(filename="custom_entities.json"):
+    """Get the custom recognizers for a custom entities file.
+    
+    The recognizers are only rebuilt when the file's modification time or
+    size changes, so unchanged definitions are not re-read and re-compiled.
+    Unchanged files are served without taking any lock.
     
     Args:
-        ticket_text: The text to anonymize
-        min_score_threshold: Minimum confidence score threshold for entities (default: 0.6)
+        filename: Path to the custom entities JSON file
+        
+    Returns:
+        Tuple of custom recognizer objects
     """
-    # Initialize Presidio engines
-    analyzer = AnalyzerEngine()
-
-    # Load custom entities and create recognizers
-    custom_entities = load_custom_entities()
-    custom_recognizers = create_custom_recognizers(custom_entities)
+    try:
+        file_stat = os.stat(filename)
+        stamp = (file_stat.st_mtime_ns, file_stat.st_size)
+    except OSError:
+        stamp = None
+
+    cached = _RECOGNIZER_CACHE.get(filename)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    # Only one thread rebuilds; the others keep using the previous recognizers meanwhile
+    if not _RECOGNIZER_LOCK.acquire(blocking=cached is None):
+        return cached[1]
+    try:
+        cached = _RECOGNIZER_CACHE.get(filename)
+        # Never replace the recognizers of a newer file version with those of an older stat
+        is_older = (
+            cached is not None and stamp is not None and cached[0] is not None
+            and stamp[0] < cached[0][0]
+        )
+        if cached is None or (cached[0] != stamp and not is_older):
+            recognizers = tuple(create_custom_recognizers(load_custom_entities(filename)))
+            cached = (stamp, recognizers)
+            _RECOGNIZER_CACHE[filename] = cached
+        return cached[1]
+    finally:
+        _RECOGNIZER_LOCK.release()
+
+# Presidio engines shared by every ticket, built on first use. Published as a single
+# (analyzer, batch analyzer, anonymizer, custom recognizers) tuple so readers always
+# see a registry together with the custom recognizers it was built from.
+_ENGINES = None
+_ENGINE_LOCK = threading.Lock()
+
+def _get_engines():
+    """Get the shared analyzers and anonymizer, initializing them once.
     
-    # Add custom recognizers to the analyzer
-    for recognizer in custom_recognizers:
-        analyzer.registry.add_recognizer(recognizer)
-
-    anonymizer = AnonymizerEngine()
-    anonymizer.add_anonymizer(InstanceCounterAnonymizer)
+    Loading the NLP models behind AnalyzerEngine takes seconds, so the engines
+    are built on the first call, which makes concurrent callers wait, and reused
+    afterwards without any locking. Published engines are never modified: when
+    the custom entities file changes, the first caller to notice builds a new
+    registry and analyzer over the already loaded NLP engine and swaps them in,
+    while the other callers keep using the previous engines instead of waiting.
     
-    # Create a mapping between entity types and counters
-    entity_mapping = dict()
+    Returns:
+        Tuple of (analyzer, batch analyzer, anonymizer, custom entity types)
+    """
+    global _ENGINES
+    engines = _ENGINES
+    if (engines is None or _get_recognizers() is not engines[3]) \
+            and _ENGINE_LOCK.acquire(blocking=engines is None):
+        try:
+            # Re-read under the lock, so a thread which saw an older file version
+            # cannot swap its recognizers back in after a newer version
+            custom_recognizers = _get_recognizers()
+            if _ENGINES is None:
+                anonymizer = AnonymizerEngine()
+                anonymizer.add_anonymizer(InstanceCounterAnonymizer)
+
+                analyzer = AnalyzerEngine()
+                for recognizer in custom_recognizers:
+                    analyzer.registry.add_recognizer(recognizer)
+
+                _ENGINES = (analyzer, BatchAnalyzerEngine(analyzer_engine=analyzer), anonymizer, custom_recognizers)
+            elif custom_recognizers is not _ENGINES[3]:
+                previous_analyzer, _, anonymizer, _ = _ENGINES
+
+                registry = RecognizerRegistry()
+                registry.load_predefined_recognizers(
+                    languages=previous_analyzer.supported_languages,
+                    nlp_engine=previous_analyzer.nlp_engine
+                )
+                for recognizer in custom_recognizers:
+                    registry.add_recognizer(recognizer)
 
-    # Define entity types to detect (standard + custom)
-    entity_types = ["PERSON", "PHONE_NUMBER", "EMAIL_ADDRESS", "URL", "IP_ADDRESS"]
-    
-    # Add custom entity types
-    for entity in custom_entities:
-        entity_types.append(entity["entity_name"])
-    
-    # Analyze text to detect PII
-    all_analysis_results = analyzer.analyze(
-        text=ticket_text,
-        entities=entity_types,
-        language="en"
-    )
-    
-    # Filter out entities with score below the threshold
-    analysis_results = [entity for entity in all_analysis_results if entity.score >= min_score_threshold]
-    
-    print(f"Analyzed the ticket for PII entities! Found {len(all_analysis_results)} entities.")
-    print(f"After filtering (score >= {min_score_threshold}): {len(analysis_results)} entities.")
+                analyzer = AnalyzerEngine(
+                    registry=registry,
+                    nlp_engine=previous_analyzer.nlp_engine,
+                    supported_languages=previous_analyzer.supported_languages
+                )
+
+                # A single reference swap, so readers see either the old or the new engines
+                _ENGINES = (analyzer, BatchAnalyzerEngine(analyzer_engine=analyzer), anonymizer, custom_recognizers)
+            engines = _ENGINES
+        finally:
+            _ENGINE_LOCK.release()
+
+    analyzer, batch_analyzer, anonymizer, custom_recognizers = engines
+    custom_entity_types = [
+        entity_type
+        for recognizer in custom_recognizers
+        for entity_type in recognizer.supported_entities
+    ]
+    return analyzer, batch_analyzer, anonymizer, custom_entity_types
+
+# Standard Presidio entity types to detect, in addition to the custom ones
+ENTITY_TYPES = ["PERSON", "PHONE_NUMBER", "EMAIL_ADDRESS", "URL", "IP_ADDRESS"]
+
+def _print_mapping_summary(entity_mapping):
+    """Print how many unique entities of each type the entity mapping contains."""
+    type_mappings = {k: v for k, v in entity_mapping.items() if k not in INTERNAL_KEYS}
+    print(f"Entity mapping contains {sum(len(entities) for entities in type_mappings.values())} total entities")
+    for entity_type, entities in type_mappings.items():
+        print(f"  {entity_type}: {len(entities)} unique entities")
+
+def _anonymize_analyzed(anonymizer, ticket_text, analysis_results, min_score_threshold, entity_mapping, audit, verbose):
+    """Anonymize ticket text from its analysis results, extending entity_mapping."""
+    if audit:
+        # Audit results include every detection, so filter out entities with score below the threshold
+        all_analysis_results = analysis_results
+        analysis_results = [entity for entity in all_analysis_results if entity.score >= min_score_threshold]
+        if verbose:
+            print(f"Analyzed the ticket for PII entities! Found {len(all_analysis_results)} entities.")
+            print(f"After filtering (score >= {min_score_threshold}): {len(analysis_results)} entities.")
+    elif verbose:
+        print(f"Analyzed the ticket for PII entities! Found {len(analysis_results)} entities with score >= {min_score_threshold}.")
     
     # Create operator config for all entity types
     operator_config = {
@@ -265,68 +520,195 @@ def anonymize_ticket(ticket_text, min_score_threshold=0.6):
         analyzer_results=analysis_results,
         operators=operator_config
     )
-    print("Anonymized the ticket!")
+    if verbose:
+        print("Anonymized the ticket!")
+        _print_mapping_summary(entity_mapping)
+
+    return anonymized_result
+
+def anonymize_ticket(ticket_text, min_score_threshold=0.6, entity_mapping=None, audit=False, verbose=True):
+    """
+    Anonymize ticket text by replacing PII entities with unique identifiers.
     
-    # Print summary of entity mapping
-    print(f"Entity mapping contains {sum(len(entities) for entities in entity_mapping.values())} total entities")
-    for entity_type, entities in entity_mapping.items():
-        print(f"  {entity_type}: {len(entities)} unique entities")
+    Args:
+        ticket_text: The text to anonymize
+        min_score_threshold: Minimum confidence score threshold for entities (default: 0.6)
+        entity_mapping: Existing entity mapping to extend, so placeholders stay
+            consistent across several parts of the same ticket (default: a new mapping)
+        audit: Also return the entities scoring below min_score_threshold (default: False)
+        verbose: Print the analysis and entity mapping summary (default: True)
+    """
+    analyzer, _, anonymizer, custom_entity_types = _get_engines()
+    
+    # Create a mapping between entity types and counters
+    if entity_mapping is None:
+        entity_mapping = dict()
 
-    # Return both filtered and unfiltered results for the JSON file
-    return anonymized_result, entity_mapping, all_analysis_results
+    # Analyze text to detect PII, dropping low scores inside the analyzer unless auditing
+    analysis_results = analyzer.analyze(
+        text=ticket_text,
+        entities=ENTITY_TYPES + custom_entity_types,
+        language="en",
+        score_threshold=0 if audit else min_score_threshold
+    )
+    
+    anonymized_result = _anonymize_analyzed(
+        anonymizer, ticket_text, analysis_results, min_score_threshold, entity_mapping, audit, verbose
+    )
+
+    # Return the analysis results for the JSON file
+    return anonymized_result, entity_mapping, analysis_results
+
+def anonymize_tickets(ticket_texts, min_score_threshold=0.6, entity_mapping=None, batch_size=32, audit=False, verbose=True):
+    """
+    Anonymize several tickets, analyzing them in batches.
+    
+    The texts go through the NLP pipeline together via BatchAnalyzerEngine,
+    which avoids paying the per-call pipeline overhead for every ticket.
+    
+    Args:
+        ticket_texts: Iterable of texts to anonymize
+        min_score_threshold: Minimum confidence score threshold for entities (default: 0.6)
+        entity_mapping: Entity mapping shared by all tickets (default: a new mapping per ticket)
+        batch_size: Number of texts processed by the NLP pipeline at once (default: 32)
+        audit: Also return the entities scoring below min_score_threshold (default: False)
+        verbose: Print the analysis and entity mapping summary per ticket (default: True)
+        
+    Returns:
+        List of (anonymized_result, entity_mapping, analysis_results) per ticket,
+        as returned by anonymize_ticket
+    """
+    _, batch_analyzer, anonymizer, custom_entity_types = _get_engines()
+
+    # analyze_iterator consumes the texts, which are needed again below
+    ticket_texts = list(ticket_texts)
+
+    # Analyze all texts to detect PII, dropping low scores inside the analyzer unless auditing
+    all_analysis_results = batch_analyzer.analyze_iterator(
+        ticket_texts,
+        language="en",
+        batch_size=batch_size,
+        entities=ENTITY_TYPES + custom_entity_types,
+        score_threshold=0 if audit else min_score_threshold
+    )
 
-def deanonymize_ticket(anonymized_result, anonymized_mapping):
-    deanonymizer_engine = DeanonymizeEngine()
-    deanonymizer_engine.add_deanonymizer(InstanceCounterDeanonymizer)
+    results = []
+    for ticket_text, ticket_analysis_results in zip(ticket_texts, all_analysis_results):
+        ticket_mapping = dict() if entity_mapping is None else entity_mapping
+        anonymized_result = _anonymize_analyzed(
+            anonymizer, ticket_text, ticket_analysis_results, min_score_threshold, ticket_mapping, audit, verbose
+        )
+        results.append((anonymized_result, ticket_mapping, ticket_analysis_results))
+    return results
 
+def deanonymize_ticket(anonymized_result, anonymized_mapping, verbose=True):
+    """
+    Restore the original values in an anonymized ticket.
+    
+    The placeholders are replaced in a single pass over the anonymized text,
+    using the positions recorded in `anonymized_result.items`, instead of
+    rebuilding the whole text once per placeholder.
+    
+    Args:
+        anonymized_result: The result returned by anonymize_ticket
+        anonymized_mapping: The entity mapping returned by anonymize_ticket
+        verbose: Print progress messages (default: True)
+    """
     # Check if there are any entities to deanonymize
     if not anonymized_mapping:
-        print("No entities to deanonymize!")
+        if verbose:
+            print("No entities to deanonymize!")
         return anonymized_result.text
-        
-    # Create operator config for all entity types
-    operator_config = {
-        "DEFAULT": OperatorConfig("entity_counter_deanonymizer", {"entity_mapping": anonymized_mapping})
-    }
 
-    deanonymized_result = deanonymizer_engine.deanonymize(
-        anonymized_result.text, 
-        anonymized_result.items,
-        operators=operator_config
-    )   
-    print("Deanonymized the ticket!")
-    return deanonymized_result
+    deanonymizer = InstanceCounterDeanonymizer()
+    params = {"entity_mapping": anonymized_mapping}
+    anonymized_text = anonymized_result.text
+
+    chunks = []
+    position = 0
+    for item in sorted(anonymized_result.items, key=lambda item: item.start):
+        params["entity_type"] = item.entity_type
+        chunks.append(anonymized_text[position:item.start])
+        chunks.append(deanonymizer.operate(item.text, params))
+        position = item.end
+    chunks.append(anonymized_text[position:])
+
+    if verbose:
+        print("Deanonymized the ticket!")
+    return "".join(chunks)
+
+# Line separating the comments of a ticket conversation
+TURN_SEPARATOR = "=" * 50
+
+def iter_turns(filename, separator=TURN_SEPARATOR):
+    """Yield a ticket conversation one turn at a time.
+    
+    A new turn starts at every separator line, which is kept at the start of
+    that turn so joining the turns gives back the original text.
+    
+    Args:
+        filename: Path to the ticket conversation file
+        separator: Line separating the turns (default: TURN_SEPARATOR)
+    """
+    with open(filename, "r") as file:
+        turn = []
+        for line in file:
+            if line.rstrip("\n") == separator and turn:
+                yield "".join(turn)
+                turn = []
+            turn.append(line)
+        if turn:
+            yield "".join(turn)
 
 def main():
     # Set the minimum confidence score threshold
     min_score_threshold = 0.6
     
-    with open("raw_ticket_conversation.txt", "r") as file:
-        ticket = file.read()
-
-    anonymized_result, mapping, analyzed_entities = anonymize_ticket(
-        ticket, 
-        min_score_threshold=min_score_threshold
-    )
-    
-    with open("anonymized_ticket_conversation.txt", "w") as file:
-        file.write(anonymized_result.text)
+    # Shared across turns so placeholders are numbered over the whole ticket
+    mapping = dict()
+    # Every detection, including those below the threshold, for the JSON metadata
+    analyzed_entities = []
+    entity_texts = []
+    # Offset of the current turn in the whole conversation
+    turn_offset = 0
+
+    # Process the ticket turn by turn so memory stays bounded by the largest turn
+    with open("anonymized_ticket_conversation.txt", "w") as anonymized_file, \
+            open("deanonymized_ticket_conversation.txt", "w") as deanonymized_file:
+        for turn in iter_turns("raw_ticket_conversation.txt"):
+            anonymized_result, mapping, turn_entities = anonymize_ticket(
+                turn, 
+                min_score_threshold=min_score_threshold,
+                entity_mapping=mapping,
+                audit=True,
+                verbose=False
+            )
+            anonymized_file.write(anonymized_result.text)
+            deanonymized_file.write(deanonymize_ticket(anonymized_result, mapping, verbose=False))
+
+            # Shift the results from turn offsets to offsets in the whole conversation
+            for entity in turn_entities:
+                entity_texts.append(turn[entity.start:entity.end])
+                entity.start += turn_offset
+                entity.end += turn_offset
+            analyzed_entities.extend(turn_entities)
+            turn_offset += len(turn)
+
+    # Print the summary once for the whole ticket rather than per turn
+    entities_above_threshold = sum(1 for entity in analyzed_entities if entity.score >= min_score_threshold)
+    print(f"Analyzed the ticket for PII entities! Found {len(analyzed_entities)} entities.")
+    print(f"After filtering (score >= {min_score_threshold}): {entities_above_threshold} entities.")
+    print("Anonymized and deanonymized the ticket!")
+    _print_mapping_summary(mapping)
     
     # Save the entity mapping and analyzed entities to a JSON file
     save_entity_mapping(
         mapping, 
         analyzed_entities, 
-        original_text=ticket,
-        min_score_threshold=min_score_threshold
+        min_score_threshold=min_score_threshold,
+        entity_texts=entity_texts
     )
     
-    deanonymized_result = deanonymize_ticket(anonymized_result, mapping)
-    with open("deanonymized_ticket_conversation.txt", "w") as file:
-        if isinstance(deanonymized_result, str):
-            file.write(deanonymized_result)
-        else:
-            file.write(deanonymized_result.text)
-    
     print("\nSanitization process complete!")
     print(f"Files created: anonymized_ticket_conversation.txt, entity_mapping.json, deanonymized_ticket_conversation.txt")
 